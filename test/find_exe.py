@@ -41,28 +41,87 @@ def GetDefaultExe(basename):
     return result
 
 
+# The default path of each tool is a constant, so build the platform-adjusted
+# names once at import instead of per lookup.
+_DEFAULT_EXES = {name: GetDefaultExe(name) for name in EXECUTABLES}
+
+
+# Directory listings gathered with os.scandir, keyed by directory. A single
+# scandir answers every candidate probe in that directory without further
+# stat() calls, which matters on network filesystems.
+_DIR_CACHE = {}
+
+
+def _CandidateExists(path):
+    dirname, basename = os.path.split(path)
+    entries = _DIR_CACHE.get(dirname)
+    if entries is None:
+        entries = {}
+        try:
+            with os.scandir(dirname) as scan:
+                for entry in scan:
+                    entries[entry.name] = entry.is_file()
+        except OSError:
+            pass
+        _DIR_CACHE[dirname] = entries
+    if basename in entries:
+        return entries[basename]
+    # The directory was unreadable, or the file appeared after we listed it.
+    return os.path.exists(path)
+
+
+# Memoized results of FindExeWithFallback, keyed by its arguments. Failed
+# lookups are cached too (as the Error to re-raise) so batched runs don't
+# re-stat paths that are known to be missing.
+_EXE_CACHE = {}
+
+
 def FindExeWithFallback(name, default_exe_list, override_exe=None):
+    key = (name, tuple(default_exe_list), override_exe)
+    cached = _EXE_CACHE.get(key)
+    if cached is not None:
+        if isinstance(cached, Error):
+            raise cached
+        return cached
+    try:
+        found = _FindExeWithFallbackUncached(name, default_exe_list,
+                                             override_exe)
+    except Error as e:
+        _EXE_CACHE[key] = e
+        raise
+    _EXE_CACHE[key] = found
+    return found
+
+
+def _FindExeWithFallbackUncached(name, default_exe_list, override_exe):
     result = override_exe
     if result is not None:
         if os.path.isdir(result):
             result = os.path.join(result, name)
-        if IS_WINDOWS and os.path.splitext(result)[1] != '.exe':
+        if IS_WINDOWS and not result.lower().endswith('.exe'):
             result += '.exe'
-        if os.path.exists(result):
-            return os.path.abspath(result)
+        # abspath is pure string manipulation; normalizing first means each
+        # candidate costs a single stat() instead of exists-then-abspath.
+        result = os.path.abspath(result)
+        if _CandidateExists(result):
+            return result
         raise Error('%s executable not found.\nsearch path: %s\n' % (name, result))
 
     for result in default_exe_list:
-        if os.path.exists(result):
-            return os.path.abspath(result)
+        result = os.path.abspath(result)
+        if _CandidateExists(result):
+            return result
 
-    raise Error('%s executable not found.\n%s\n' %
-                (name, '\n'.join('search path: %s' % path
-                 for path in default_exe_list)))
+    # Only build the multi-line message once the lookup has actually failed;
+    # the success path above never touches it.
+    search_paths = '\n'.join('search path: %s' % path
+                             for path in default_exe_list)
+    raise Error('%s executable not found.\n%s\n' % (name, search_paths))
 
 
 def FindExecutable(basename, override=None):
-    return FindExeWithFallback(basename, [GetDefaultExe(basename)], override)
+    default_exe = _DEFAULT_EXES.get(basename) or GetDefaultExe(basename)
+    return FindExeWithFallback(basename, [default_exe], override)
 
 
 def GetWat2WasmExecutable(override=None):
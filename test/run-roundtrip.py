@@ -16,7 +16,11 @@
 #
 
 import argparse
-import difflib
+import filecmp
+import hashlib
+import json
+import mmap
+import multiprocessing
 import os
 import sys
 
@@ -28,39 +32,135 @@ OK = 0
 ERROR = 1
 SKIPPED = 2
 
+# Bump to invalidate --cache entries when the roundtrip logic changes.
+CACHE_VERSION = 1
+DEFAULT_CACHE_FILE = os.path.join(find_exe.REPO_ROOT_DIR, 'out',
+                                  '.roundtrip-cache.json')
 
-def FilesAreEqual(filename1, filename2, verbose=False):
+
+def RoundtripCacheKey(filename, wat2wasm, wasm2wat, skip_roundtrip_check):
+    hasher = hashlib.blake2b(digest_size=16)
+    hasher.update(b'v%d' % CACHE_VERSION)
+    with open(filename, 'rb') as f:
+        hasher.update(f.read())
+    # A rebuilt tool or different flag set must produce a different key.
+    for exe in (wat2wasm, wasm2wat):
+        hasher.update(os.fsencode(exe.exe))
+        hasher.update(b'%d' % os.stat(exe.exe).st_mtime_ns)
+        hasher.update(' '.join(exe.after_args).encode())
+    if skip_roundtrip_check:
+        hasher.update(b'skip-check')
+    return hasher.hexdigest()
+
+
+def LoadRoundtripCache(path):
     try:
-        with open(filename1, 'rb') as file1:
-            data1 = file1.read()
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def SaveRoundtripCache(path, cache):
+    cache_dir = os.path.dirname(path)
+    if cache_dir and not os.path.exists(cache_dir):
+        os.makedirs(cache_dir)
+    with open(path, 'w') as f:
+        json.dump(cache, f)
+
+
+def MapReadOnly(file):
+    # mmap can't map empty files.
+    if os.fstat(file.fileno()).st_size == 0:
+        return b''
+    return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
 
-        with open(filename2, 'rb') as file2:
-            data2 = file2.read()
+
+def FirstDifferingOffset(data1, data2):
+    # Compare 64KB windows at C speed and only scan bytewise inside the
+    # first window that differs.
+    CHUNK_SIZE = 64 * 1024
+    view1 = memoryview(data1)
+    view2 = memoryview(data2)
+    end = min(len(view1), len(view2))
+    for start in range(0, end, CHUNK_SIZE):
+        stop = min(start + CHUNK_SIZE, end)
+        chunk1 = view1[start:stop]
+        chunk2 = view2[start:stop]
+        if chunk1 != chunk2:
+            for i in range(stop - start):
+                if chunk1[i] != chunk2[i]:
+                    return start + i
+    # One file is a prefix of the other.
+    return end
+
+
+def FilesAreEqual(filename1, filename2, verbose=False):
+    try:
+        # filecmp streams both files in small chunks and stops at the first
+        # mismatch, so equal files never get read fully into memory.
+        if filecmp.cmp(filename1, filename2, shallow=False):
+            return (OK, '')
     except OSError as e:
         return (ERROR, str(e))
 
-    if data1 != data2:
-        msg = 'files differ'
-        if verbose:
-            hexdump1 = utils.Hexdump(data1)
-            hexdump2 = utils.Hexdump(data2)
-            diff_lines = []
-            for line in difflib.unified_diff(hexdump1, hexdump2,
-                                             fromfile=filename1,
-                                             tofile=filename2):
-                diff_lines.append(line)
-            msg += ''.join(diff_lines)
-        msg += '\n'
-        return (ERROR, msg)
-    return (OK, '')
+    msg = 'files differ'
+    if verbose:
+        # Deferred: difflib is only needed on this failure path, and its
+        # import cost is paid by every test process otherwise.
+        import difflib
+        try:
+            # Map rather than read: large mismatching files never land on
+            # the Python heap, only the dumped windows do.
+            with open(filename1, 'rb') as file1, \
+                    open(filename2, 'rb') as file2:
+                data1 = MapReadOnly(file1)
+                data2 = MapReadOnly(file2)
+                try:
+                    diff_offset = FirstDifferingOffset(data1, data2)
+                    # Round down to a hexdump line so the two dumps stay
+                    # aligned.
+                    window_start = max(0, diff_offset - 64) & ~15
+                    window_end = diff_offset + 192
+                    window1 = bytes(data1[window_start:window_end])
+                    window2 = bytes(data2[window_start:window_end])
+                finally:
+                    for mapped in (data1, data2):
+                        if isinstance(mapped, mmap.mmap):
+                            mapped.close()
+        except OSError as e:
+            return (ERROR, str(e))
+
+        msg += ' at offset 0x%x (window starts at 0x%x)\n' % (diff_offset,
+                                                              window_start)
+        hexdump1 = utils.Hexdump(window1)
+        hexdump2 = utils.Hexdump(window2)
+        diff_lines = []
+        for line in difflib.unified_diff(hexdump1, hexdump2,
+                                         fromfile=filename1,
+                                         tofile=filename2):
+            diff_lines.append(line)
+        msg += ''.join(diff_lines)
+    msg += '\n'
+    return (ERROR, msg)
+
+
+def GetOutPaths(out_dir, filename):
+    basename_noext = os.path.splitext(os.path.basename(filename))[0]
+    # Distinct inputs can share a basename (e.g. the same test name in two
+    # suites); qualify the stem with a short digest of the full path so
+    # their outputs never collide, while staying deterministic across runs.
+    digest = hashlib.blake2b(os.fsencode(filename),
+                             digest_size=6).hexdigest()
+    stem = '%s-%s' % (basename_noext, digest)
+    join = os.path.join
+    return (join(out_dir, stem + '-1.wasm'),
+            join(out_dir, stem + '-2.wat'),
+            join(out_dir, stem + '-3.wasm'))
 
 
 def DoRoundtrip(wat2wasm, wasm2wat, out_dir, filename, verbose, stdout, skip_roundtrip_check):
-    basename = os.path.basename(filename)
-    basename_noext = os.path.splitext(basename)[0]
-    wasm1_file = os.path.join(out_dir, basename_noext + '-1.wasm')
-    wat2_file = os.path.join(out_dir, basename_noext + '-2.wat')
-    wasm3_file = os.path.join(out_dir, basename_noext + '-3.wasm')
+    wasm1_file, wat2_file, wasm3_file = GetOutPaths(out_dir, filename)
     try:
         wat2wasm.RunWithArgs('-o', wasm1_file, filename)
     except Error:
@@ -80,7 +180,26 @@ def DoRoundtrip(wat2wasm, wasm2wat, out_dir, filename, verbose, stdout, skip_rou
     return FilesAreEqual(wasm1_file, wasm3_file, verbose)
 
 
-def main(args):
+def _InitWorker(wat2wasm, wasm2wat, out_dir, verbose, stdout,
+                skip_roundtrip_check):
+    global _worker_state
+    # Each worker writes to its own subdirectory so parallel roundtrips of
+    # files with the same basename don't clobber each other.
+    worker_dir = os.path.join(out_dir, 'worker-%d' % os.getpid())
+    os.makedirs(worker_dir, exist_ok=True)
+    _worker_state = (wat2wasm, wasm2wat, worker_dir, verbose, stdout,
+                     skip_roundtrip_check)
+
+
+def _RunOne(filename):
+    wat2wasm, wasm2wat, out_dir, verbose, stdout, skip_roundtrip_check = \
+        _worker_state
+    result, msg = DoRoundtrip(wat2wasm, wasm2wat, out_dir, filename, verbose,
+                              stdout, skip_roundtrip_check)
+    return (filename, result, msg)
+
+
+def _BuildParser():
     parser = argparse.ArgumentParser()
     parser.add_argument('-v', '--verbose', help='print more diagnotic messages.',
                         action='store_true')
@@ -122,8 +241,32 @@ def main(args):
                         help="write exports inline and skip end-to-end roundtrip check")
     parser.add_argument('--inline-imports', action='store_true')
     parser.add_argument('--reloc', action='store_true')
-    parser.add_argument('file', help='test file.')
-    options = parser.parse_args(args)
+    parser.add_argument('-j', '--jobs', type=int, default=1, metavar='N',
+                        help='number of files to roundtrip in parallel.')
+    parser.add_argument('--files-from', metavar='PATH',
+                        help='read additional test files from PATH, one per '
+                        'line.')
+    parser.add_argument('--cache', action='store_true',
+                        help='memoize passing results keyed by input and '
+                        'tool versions, so unchanged tests skip all '
+                        'subprocess calls on later runs.')
+    parser.add_argument('--cache-file', metavar='PATH',
+                        default=DEFAULT_CACHE_FILE,
+                        help='where --cache stores its results.')
+    parser.add_argument('--tmpfs', action='store_true',
+                        help='put temporary outputs on /dev/shm when '
+                        'available, so roundtrip I/O never hits disk.')
+    parser.add_argument('files', nargs='*', metavar='file', help='test file.')
+    return parser
+
+
+# Built once at import; argparse parser construction is not free, and batched
+# callers may invoke main() many times in one process.
+_PARSER = _BuildParser()
+
+
+def main(args):
+    options = _PARSER.parse_args(args)
 
     wat2wasm = utils.Executable(
         find_exe.GetWat2WasmExecutable(options.bindir),
@@ -177,19 +320,89 @@ def main(args):
     wat2wasm.verbose = options.print_cmd
     wasm2wat.verbose = options.print_cmd
 
-    filename = options.file
-    if not os.path.exists(filename):
-        sys.stderr.write('File not found: %s\n' % filename)
-        return ERROR
+    filenames = list(options.files)
+    if options.files_from:
+        try:
+            with open(options.files_from) as list_file:
+                filenames.extend(line.strip() for line in list_file
+                                 if line.strip())
+        except OSError as e:
+            sys.stderr.write('Error reading %s: %s\n' % (options.files_from, e))
+            return ERROR
+    if not filenames:
+        _PARSER.error('no input files.')
+
+    for filename in filenames:
+        if not os.path.exists(filename):
+            sys.stderr.write('File not found: %s\n' % filename)
+            return ERROR
+
+    temp_dir = None
+    if options.tmpfs and os.access('/dev/shm', os.W_OK):
+        temp_dir = '/dev/shm'
 
     skip_roundtrip_check = options.generate_names or options.inline_exports
-    with utils.TempDirectory(options.out_dir, 'roundtrip-') as out_dir:
-        result, msg = DoRoundtrip(wat2wasm, wasm2wat, out_dir, filename,
-                                  options.verbose, options.stdout, skip_roundtrip_check)
+
+    # --stdout runs for their output, which a cache hit would swallow.
+    cache = None
+    cache_keys = {}
+    cached_results = []
+    if options.cache and not options.stdout:
+        cache = LoadRoundtripCache(options.cache_file)
+        uncached_filenames = []
+        for filename in filenames:
+            key = RoundtripCacheKey(filename, wat2wasm, wasm2wat,
+                                    skip_roundtrip_check)
+            cache_keys[filename] = key
+            if cache.get(key) == 'ok':
+                cached_results.append((filename, OK, ''))
+            else:
+                uncached_filenames.append(filename)
+        filenames = uncached_filenames
+
+    with utils.TempDirectory(options.out_dir, 'roundtrip-',
+                             dir=temp_dir) as out_dir:
+        if options.jobs > 1 and len(filenames) > 1:
+            pool = multiprocessing.Pool(
+                options.jobs, initializer=_InitWorker,
+                initargs=(wat2wasm, wasm2wat, out_dir, options.verbose,
+                          options.stdout, skip_roundtrip_check))
+            try:
+                results = list(pool.imap_unordered(_RunOne, filenames,
+                                                   chunksize=8))
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            results = []
+            for filename in filenames:
+                result, msg = DoRoundtrip(wat2wasm, wasm2wat, out_dir,
+                                          filename, options.verbose,
+                                          options.stdout,
+                                          skip_roundtrip_check)
+                results.append((filename, result, msg))
+
+    if cache is not None:
+        for filename, result, msg in results:
+            if result == OK:
+                cache[cache_keys[filename]] = 'ok'
+        SaveRoundtripCache(options.cache_file, cache)
+        results.extend(cached_results)
+
+    if len(results) == 1:
+        # Preserve single-file behavior; run-tests.py distinguishes SKIPPED.
+        _, result, msg = results[0]
         if result == ERROR:
             sys.stderr.write(msg)
         return result
 
+    any_error = False
+    for filename, result, msg in results:
+        if result == ERROR:
+            any_error = True
+            sys.stderr.write('%s: %s' % (filename, msg))
+    return ERROR if any_error else OK
+
 
 if __name__ == '__main__':
     try:
@@ -46,6 +46,8 @@ class Executable(object):
         self.stdout_handle = self._ForwardHandle(kwargs.get('forward_stdout'))
         self.stderr_handle = self._ForwardHandle(kwargs.get('forward_stderr'))
         self.verbose = False
+        self.server_process = None
+        self.server_unsupported = False
 
     def _ForwardHandle(self, forward):
         return None if forward else subprocess.PIPE
@@ -94,6 +96,69 @@ class Executable(object):
         if error:
             raise error
 
+    def _EnsureServer(self):
+        if self.server_process is not None and \
+                self.server_process.poll() is None:
+            return
+        cmd = [self.exe, '--server'] + self.after_args
+        if self.verbose:
+            print(shlex.join(cmd))
+        self.server_process = subprocess.Popen(cmd, stdin=subprocess.PIPE,
+                                               stdout=subprocess.PIPE,
+                                               stderr=subprocess.DEVNULL)
+
+    def RunWithArgsServer(self, *args):
+        """Run one job on a persistent `exe --server` child process.
+
+        Each job is a length-prefixed JSON object written to the child's
+        stdin; the child answers with one JSON line containing returncode,
+        stdout and stderr. This avoids a process spawn per invocation. Tools
+        that don't support --server yet fall back to a one-shot RunWithArgs
+        (and are remembered, so the probe only happens once).
+        """
+        if self.server_unsupported:
+            return self.RunWithArgs(*args)
+        self._EnsureServer()
+        job = json.dumps({'args': list(args)}).encode()
+        try:
+            self.server_process.stdin.write(b'%d\n' % len(job) + job)
+            self.server_process.stdin.flush()
+            response_line = self.server_process.stdout.readline()
+        except OSError:
+            response_line = b''
+        try:
+            response = json.loads(response_line) if response_line else None
+        except ValueError:
+            # Tools that don't know --server may print usage text rather
+            # than a JSON response.
+            response = None
+        if response is None:
+            # The child exited or answered garbage instead of speaking the
+            # server protocol.
+            self.server_unsupported = True
+            self.StopServer()
+            return self.RunWithArgs(*args)
+        returncode = response.get('returncode', 0)
+        stdout = response.get('stdout', '')
+        stderr = response.get('stderr', '')
+        if stdout:
+            sys.stdout.write(stdout)
+        if returncode != 0:
+            cmd_str = shlex.join([self.exe] + list(args) + self.after_args)
+            err_cmd_str = cmd_str if self.error_cmdline else self.basename
+            raise Error('Error running "%s" (%d):\n%s\n%s' %
+                        (err_cmd_str, returncode, stdout, stderr))
+
+    def StopServer(self):
+        if self.server_process is None:
+            return
+        try:
+            self.server_process.stdin.close()
+        except OSError:
+            pass
+        self.server_process.wait()
+        self.server_process = None
+
     def AppendArg(self, arg):
         self.after_args.append(arg)
 
@@ -107,13 +172,13 @@ class Executable(object):
 
 
 @contextlib.contextmanager
-def TempDirectory(out_dir, prefix=None):
+def TempDirectory(out_dir, prefix=None, dir=None):
     if out_dir:
         out_dir_is_temp = False
         if not os.path.exists(out_dir):
             os.makedirs(out_dir)
     else:
-        out_dir = tempfile.mkdtemp(prefix=prefix)
+        out_dir = tempfile.mkdtemp(prefix=prefix, dir=dir)
         out_dir_is_temp = True
 
     try: